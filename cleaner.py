@@ -12,13 +12,27 @@ import io
 import builtins
 import argparse
 import time
-import calendar
 import logging
 import json
+import random
+import re
 import fnmatch
+import functools
+import collections
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import threading
+import httplib2
+import google_auth_httplib2
 from googleapiclient import discovery
 from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
+from googleapiclient.model import JsonModel
 from google.auth.exceptions import RefreshError
+try:
+    # optional, faster decoding of API responses
+    import orjson
+except ImportError:
+    orjson = None
 
 from google_auth import GoogleAuth
 from dots import Dots
@@ -40,7 +54,15 @@ PAGE_SIZE_SMALL = 100
 PAGE_SIZE_SWITCH_THRESHOLD = 3000
 RETRY_NUM = 3
 RETRY_INTERVAL = 2
+RETRY_DELAY_MAX = 32
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+DELETE_RETRY_NUM = 5
+RATE_LIMIT_REASONS = ('userRateLimitExceeded', 'rateLimitExceeded')
 TIMEOUT_DEFAULT = 300
+CONCURRENCY_DEFAULT = 4
+PATH_CACHE_MAX = 200000
+
+_threadLocal = threading.local()
 
 class TimeoutError(Exception):
     pass
@@ -48,18 +70,30 @@ class TimeoutError(Exception):
 class PageTokenFile:
     def __init__(self, filePath):
         self.path = filePath
+        self._last = None   # token known to be in the file
     
+    # The file holds the token as ASCII digits. It is read and written as 
+    # bytes, int() parses bytes directly without a text codec.
     def get(self):
         try:
-            with open(self.path, 'r', encoding='utf-8') as f:
+            with open(self.path, 'rb') as f:
                 pageToken = int(f.read())
         except (FileNotFoundError, ValueError):
-            pageToken = 0
+            return 0
+        self._last = pageToken
         return pageToken
     
     def save(self, pageToken):
-        with open(self.path, 'w', encoding='utf-8') as f:
-            f.write(str(pageToken))
+        pageToken = int(pageToken)
+        if pageToken == self._last:
+            return
+        # write a temporary file and move it into place, so the token file 
+        # is never left truncated
+        tmpPath = self.path + '.tmp'
+        with open(tmpPath, 'wb') as f:
+            f.write(b'%d' % pageToken)
+        os.replace(tmpPath, self.path)
+        self._last = pageToken
 
 class SafePrinter:
     class _SafeTextWrapper:
@@ -69,8 +103,18 @@ class SafePrinter:
             self.unsafeTextFile = unsafeTextFile
             self.encoding = unsafeTextFile.encoding
             self.error = error
+            # let the stream handle unencodable characters itself if it can, 
+            # instead of transcoding every write
+            try:
+                unsafeTextFile.reconfigure(errors=error)
+                self._reconfigured = True
+            except (AttributeError, io.UnsupportedOperation, ValueError):
+                self._reconfigured = False
         def write(self, text):
-            self.unsafeTextFile.write(text.encode(self.encoding, self.error).decode(self.encoding, 'ignore'))
+            if self._reconfigured:
+                self.unsafeTextFile.write(text)
+            else:
+                self.unsafeTextFile.write(text.encode(self.encoding, self.error).decode(self.encoding, 'ignore'))
         def flush(self):
             self.unsafeTextFile.flush()
     
@@ -79,15 +123,26 @@ class SafePrinter:
             raise ValueError("`error` must be one of 'replace', 'xmlcharrefreplace', 'backslashreplace', 'namereplace'")
         self.defaultFile = defaultFile or sys.stdout
         self.error = error
-        self.wrappers = {id(self.defaultFile): SafePrinter._SafeTextWrapper(self.defaultFile, self.error)}
+        self._defaultWrapper = SafePrinter._SafeTextWrapper(self.defaultFile, self.error)
+        self.wrappers = {id(self.defaultFile): self._defaultWrapper}
     
     def get_print(self):
+        # bound to locals so the common case (default file) costs no lookups
+        defaultFile = self.defaultFile
+        defaultWrapper = self._defaultWrapper
+        wrappers = self.wrappers
+        _print = builtins.print
         def print(*args, **kwargs):
-            file = kwargs.get('file') or self.defaultFile
-            if id(file) not in self.wrappers:
-                self.wrappers[id(file)] = SafePrinter._SafeTextWrapper(file, self.error)
-            kwargs['file'] = self.wrappers[id(file)]
-            builtins.print(*args, **kwargs)
+            file = kwargs.get('file')
+            if file is None or file is defaultFile:
+                kwargs['file'] = defaultWrapper
+            else:
+                wrapper = wrappers.get(id(file))
+                if wrapper is None:
+                    wrapper = SafePrinter._SafeTextWrapper(file, self.error)
+                    wrappers[id(file)] = wrapper
+                kwargs['file'] = wrapper
+            _print(*args, **kwargs)
         return print
     
     def clear(self):
@@ -99,8 +154,9 @@ class SafePrinter:
             del self.wrappers[id]
     
     def purge(self):
+        # cleared in place, functions from get_print hold a reference to it
         self.wrappers.clear()
-        self.wrappers = {id(self.defaultFile): SafePrinter._SafeTextWrapper(self.defaultFile, self.error)}
+        self.wrappers[id(self.defaultFile)] = self._defaultWrapper
 
 try:
     print = SafePrinter().get_print()
@@ -130,7 +186,7 @@ def main():
                 return
             else:
                 return
-            time.sleep(RETRY_INTERVAL)
+            time.sleep(backoff_delay(i))
         print("Retries unsuccessful. Abort action.")
         return
 
@@ -152,7 +208,7 @@ def main():
             return
         else:
             break
-        time.sleep(RETRY_INTERVAL)
+        time.sleep(backoff_delay(i))
     else:
         print("Retries unsuccessful. Abort action.")
         return
@@ -176,11 +232,14 @@ def parse_cmdline():
             help='Only view which files are to be deleted without deleting them')
     parser.add_argument('-d', '--days', action='store', type=int, default=30, metavar='#',
             help='Number of days files can remain in Google Drive trash '
-                 'before being deleted. Default is %(default)s')
+                 'before being deleted. 0 empties the whole trash. '
+                 'Default is %(default)s')
     parser.add_argument('-q', '--quiet', action='store_true', 
             help='Quiet mode. Only show file count.')
     parser.add_argument('-t', '--timeout', action='store', type=int, default=TIMEOUT_DEFAULT, metavar='SECS',
             help='Specify timeout period in seconds. Default is %(default)s')
+    parser.add_argument('-c', '--concurrency', action='store', type=int, default=CONCURRENCY_DEFAULT, metavar='N',
+            help='Number of batch delete requests sent at once. Default is %(default)s')
     parser.add_argument('-m', '--mydriveonly', action='store_true',
             help="Only delete files in the 'My Drive' hierarchy, excluding those in 'Computers' etc.")
     parser.add_argument('--noprogress', action='store_true',
@@ -206,15 +265,24 @@ def parse_cmdline():
         parser.error('argument --days must be nonnegative')
     if flags.timeout < 0:
         parser.error('argument --timeout must be nonnegative')
+    if flags.concurrency < 1:
+        parser.error('argument --concurrency must be positive')
+    # parent folders of all paths, each created once
+    folders = set()
     if flags.logfile and flags.logfile.strip():
         flags.logfile = os.path.realpath(flags.logfile)
-        os.makedirs(os.path.dirname(flags.logfile),    exist_ok=True)
+        folders.add(os.path.dirname(flags.logfile))
     if flags.quiet and not flags.logfile:
         flags.fullpath = False
+    # in quiet mode full paths only go to the log, so they can wait until 
+    # files are actually deleted
+    flags.deferpath = flags.fullpath and flags.quiet
     flags.ptokenfile = os.path.realpath(flags.ptokenfile)
     flags.credfile   = os.path.realpath(flags.credfile)
-    os.makedirs(os.path.dirname(flags.ptokenfile), exist_ok=True)
-    os.makedirs(os.path.dirname(flags.credfile),   exist_ok=True)
+    folders.add(os.path.dirname(flags.ptokenfile))
+    folders.add(os.path.dirname(flags.credfile))
+    for folder in folders:
+        os.makedirs(folder, exist_ok=True)
     return flags
 
 def configure_logs(logPath):
@@ -245,9 +313,36 @@ def build_service(flags):
     except FileNotFoundError as e:
         print(str(e))
         sys.exit(1)
-    service = discovery.build('drive', 'v3', credentials=credentials)
+    model = OrjsonModel() if orjson else None
+    service = discovery.build('drive', 'v3', credentials=credentials, model=model)
     return service
 
+class OrjsonModel(JsonModel):
+    """JsonModel decoding API responses with orjson instead of json"""
+    def deserialize(self, content):
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return super().deserialize(content)
+        if self._data_wrapper and 'data' in body:
+            body = body['data']
+        return body
+
+def thread_http(service):
+    """Return an authorized Http object for the calling thread
+    
+    httplib2 is not thread-safe, so requests executed outside the main thread 
+    must each be given their own Http object (see the thread safety note 
+    above delete_files_batch). The object is kept per thread, so requests 
+    from the same thread reuse its connection, until the credentials of 
+    service change."""
+    credentials = service._http.credentials
+    http = getattr(_threadLocal, 'http', None)
+    if http is None or http.credentials is not credentials:
+        http = google_auth_httplib2.AuthorizedHttp(credentials, http=build_http())
+        _threadLocal.http = http
+    return http
+
 def get_deletion_list(service, pageToken, flags, pathFinder=None):
     """Get list of files to be deleted and page token for future use.
     
@@ -265,11 +360,15 @@ def get_deletion_list(service, pageToken, flags, pathFinder=None):
                     deleted.
     deletionList:   List of trashed files to be deleted, in ascending order of 
                     trash time. Each file is represented as a dictionary with 
-                    keys {'fileId', 'time', 'name'}.
+                    keys {'fileId', 'time', 'name'}. If path lookup is 
+                    deferred, 'name' is the file name and the file resource 
+                    is kept under 'file' (see resolve_deferred_paths).
     flags:          Flags parsed from command line. Should contain the 
                     following attributes:
                     --noprogress    don't show scanning progress
                     --fullpath      show full path
+                    deferpath       look up full paths after deletion is 
+                                    confirmed instead of during the scan
                     --mydriveonly   restrict to my drive
                     --quiet         don't show individual file info
                     --timeout       timeout in seconds
@@ -291,40 +390,106 @@ def get_deletion_list(service, pageToken, flags, pathFinder=None):
     if not pageToken:
         pageToken = 1
     pageTokenBefore = pageToken
-    pageSize = PAGE_SIZE_LARGE
     progress = ScanProgress(quiet=flags.quiet, noProgress=flags.noprogress)
-    if not pathFinder and flags.fullpath:
+    if not pathFinder and flags.fullpath and not flags.deferpath:
         pathFinder = PathFinder(service)
-    while pageToken:
+    
+    # parents are only needed to find full paths
+    fileFields = 'name,explicitlyTrashed,ownedByMe'
+    if flags.fullpath:
+        fileFields += ',parents'
+    fields = 'nextPageToken,newStartPageToken,changes(fileId,time,file({:}))'.format(fileFields)
+    
+    # loop invariants, looked up once instead of per change
+    # changes made after cutoff are too recent to delete
+    cutoff = currentTime - flags.days*24*3600
+    fullPath = flags.fullpath
+    deferPath = flags.deferpath
+    printTime = progress.print_time
+    found = progress.found
+    addToList = deletionList.append
+    
+    def list_changes(pageToken, pageSize=PAGE_SIZE_LARGE):
         if latestPageToken - int(pageToken) < PAGE_SIZE_SWITCH_THRESHOLD:
-            pageSize = PAGE_SIZE_SMALL
-        request = service.changes().list(
+            pageSize = min(pageSize, PAGE_SIZE_SMALL)
+        return service.changes().list(
                     pageToken=pageToken, includeRemoved=False,
                     pageSize=pageSize, restrictToMyDrive=flags.mydriveonly,
-                    fields='nextPageToken,newStartPageToken,'
-                    'changes(fileId,time,file(name,parents,explicitlyTrashed,ownedByMe))'
+                    fields=fields
                     )
-        response = execute_request(request, flags.timeout)
-        items = response.get('changes', [])
-        for item in items:
-            itemTime = parse_time(item['time'])
-            if currentTime - itemTime < flags.days*24*3600:
-                progress.clear_line()
-                return deletionList, pageTokenBefore, pageToken
-            progress.print_time(item['time'])
-            if item['file']['explicitlyTrashed'] and item['file']['ownedByMe']:
-                if flags.fullpath:
-                    disp = pathFinder.get_path(item['fileId'], fileRes=item['file'])
-                else:
-                    disp = item['file']['name']
-                progress.found(item['time'], disp)
-                deletionList.append({'fileId': item['fileId'], 'time': item['time'],
-                                        'name': disp})
-        pageToken = response.get('nextPageToken')
-        if not deletionList:
-            pageTokenBefore = pageToken
+    
+    # Pages are fetched one ahead on a worker thread, so the next request is 
+    # in flight while the current page is processed. The worker has its own 
+    # Http object since httplib2 is not thread-safe.
+    prefetcher = ThreadPoolExecutor(max_workers=1)
+    def fetch(request):
+        return execute_request(request, flags.timeout, thread_http(service))
+    future = prefetcher.submit(fetch, list_changes(pageToken))
+    try:
+        while pageToken:
+            response = future.result()
+            nextPageToken = response.get('nextPageToken')
+            items = response.get('changes', [])
+            # each change time is parsed once and reused below
+            times = parse_times([item['time'] for item in items])
+            # no need for the next page if the scan is going to stop in this 
+            # one; near the stopping point, fetch no more than needed
+            if nextPageToken and not (times and times[-1] > cutoff):
+                pageSize = estimate_page_size(times, cutoff)
+                future = prefetcher.submit(fetch, list_changes(nextPageToken, pageSize))
+            if fullPath and not deferPath:
+                # look up the folders of this page in batches before get_path
+                pathFinder.prefetch([parent for itemTime, item in zip(times, items)
+                        if itemTime <= cutoff
+                        and item['file']['explicitlyTrashed'] and item['file']['ownedByMe']
+                        for parent in item['file'].get('parents', [])[:1]])
+            for itemTime, item in zip(times, items):
+                timeStr = item['time']
+                if itemTime > cutoff:
+                    progress.clear_line()
+                    return deletionList, pageTokenBefore, pageToken
+                printTime(timeStr)
+                file = item['file']
+                if file['explicitlyTrashed'] and file['ownedByMe']:
+                    if deferPath:
+                        addToList({'fileId': item['fileId'], 'time': timeStr,
+                                   'name': file['name'], 'file': file})
+                        continue
+                    if fullPath:
+                        disp = pathFinder.get_path(item['fileId'], fileRes=file)
+                    else:
+                        disp = file['name']
+                    found(timeStr, disp)
+                    addToList({'fileId': item['fileId'], 'time': timeStr, 'name': disp})
+            pageToken = nextPageToken
+            if not deletionList:
+                pageTokenBefore = pageToken
+    finally:
+        # drop the prefetched page if the scan stopped early
+        future.cancel()
+        prefetcher.shutdown(wait=False)
     progress.clear_line()
-    return deletionList, pageTokenBefore, int(response.get('newStartPageToken'))
+    pageTokenAfter = int(response.get('newStartPageToken'))
+    if not deletionList:
+        # the whole change list was scanned and nothing is to be deleted
+        pageTokenBefore = pageTokenAfter
+    return deletionList, pageTokenBefore, pageTokenAfter
+
+def estimate_page_size(times, stopTime):
+    """Estimate the page size needed to reach changes made at stopTime
+    
+    Extrapolates the rate of changes in times, the Unix times of a page of 
+    the change list, and allows twice the estimated number of changes. The 
+    result is between PAGE_SIZE_SMALL and PAGE_SIZE_LARGE.
+    """
+    if len(times) < 2:
+        return PAGE_SIZE_LARGE
+    firstTime = times[0]
+    lastTime = times[-1]
+    if lastTime <= firstTime:
+        return PAGE_SIZE_LARGE
+    remaining = (stopTime - lastTime) * (len(times) - 1) / (lastTime - firstTime)
+    return max(PAGE_SIZE_SMALL, min(PAGE_SIZE_LARGE, int(2*remaining)))
 
 def delete_old_files(service, deletionList, flags):
     """Print and delete files in deletionList
@@ -356,43 +521,33 @@ def delete_old_files(service, deletionList, flags):
         confirmed = ask_usr_confirmation(n)
         if not confirmed:
             return False
+    if flags.deferpath:
+        resolve_deferred_paths(service, deletionList)
     print('Deleting...')
-    deleted_count = 0
-    errors = []
-
-    def batch_callback(request_id, response, exception):
-        nonlocal deleted_count
-        if exception:
-            errors.append((request_id, exception))
-        else:
-            deleted_count += 1
-            # Find the item to log
-            for item in deletionList:
-                if item['fileId'] == request_id:
-                    logger.info(item['time'] + ''.ljust(4) + item['name'])
-                    break
+    if flags.days == 0 and not flags.mydriveonly:
+        # everything in trash is due for deletion, a single call empties it
+        execute_request(service.files().emptyTrash(), flags.timeout)
+        for item in deletionList:
+            logger.info(item['time'] + ''.ljust(4) + item['name'])
+        print('Files successfully deleted')
+        return True
+    id_map = {item['fileId']: item for item in deletionList}
 
     # Process files in batches (reversed to delete newest first)
-    reversed_list = list(reversed(deletionList))
-    for i in range(0, len(reversed_list), BATCH_SIZE):
-        batch_files = reversed_list[i:i + BATCH_SIZE]
-        batch = service.new_batch_http_request(callback=batch_callback)
-
-        for item in batch_files:
-            batch.add(
-                service.files().delete(fileId=item['fileId']),
-                request_id=item['fileId']
-            )
-
-        try:
-            batch.execute()
-        except Exception as e:
-            print(f'Batch request failed: {e}')
+    def report_batch(batch_num, error):
+        if error:
+            print(f'Batch request failed: {error}')
+    file_ids = [item['fileId'] for item in reversed(deletionList)]
+    deleted, errors = delete_with_retry(service, file_ids, flags.timeout,
+                                        flags.concurrency, report_batch)
+    deleted_count = len(deleted)
+    for file_id in deleted:
+        item = id_map[file_id]
+        logger.info(item['time'] + ''.ljust(4) + item['name'])
 
     # Report errors
     for file_id, error in errors:
-        file_name = next((item['name'] for item in deletionList if item['fileId'] == file_id), file_id)
-        print(f'Error deleting {file_name}: {error}')
+        print(f'Error deleting {id_map[file_id]["name"]}: {error}')
 
     if errors:
         print(f'Deleted {deleted_count} files, {len(errors)} errors')
@@ -400,6 +555,24 @@ def delete_old_files(service, deletionList, flags):
         print('Files successfully deleted')
     return True
 
+def resolve_deferred_paths(service, deletionList, pathFinder=None):
+    """Replace file names in deletionList with full paths
+    
+    Only items carrying a file resource under 'file' are resolved; the 
+    resource is dropped afterwards.
+    """
+    if not pathFinder:
+        pathFinder = PathFinder(service)
+    parentIds = []
+    for item in deletionList:
+        if 'file' in item:
+            parentIds.extend(item['file'].get('parents', [])[:1])
+    pathFinder.prefetch(parentIds)
+    for item in deletionList:
+        file = item.pop('file', None)
+        if file:
+            item['name'] = pathFinder.get_path(item['fileId'], fileRes=file)
+
 def run_glob_deletion(service, flags):
     """Run glob-based deletion using config from globs.json."""
     config = load_globs_config(flags.globs)
@@ -420,14 +593,28 @@ def run_glob_deletion(service, flags):
     print(f'Patterns: {patterns}')
     print()
 
+    # Folder lookups are shared by all patterns
+    parent_cache = {}
+    match_cache = {}
+    if required_parent:
+        prefetch_folders(service, flags.timeout, parent_cache)
+
+    # The trash is listed once for all patterns and split by pattern in
+    # memory. Files already deleted are left out of later patterns.
+    start_time = time.time()
+    candidates = get_trashed_files_by_globs(service, patterns, max_date, flags.timeout,
+                                            required_parent, parent_cache, match_cache)
+    print(f'Search completed in {time.time() - start_time:.1f}s')
+    print()
+    deleted_ids = set()
+
     for pattern in patterns:
         print(f'--- Processing pattern: {pattern} ---')
-        start_time = time.time()
-        files = get_trashed_files_by_glob(service, pattern, max_date, flags.timeout, required_parent)
-        elapsed = time.time() - start_time
+        match_name = glob_matcher(pattern)
+        files = [f for f in candidates
+                 if f['id'] not in deleted_ids and match_name(f['name'])]
 
         if not files:
-            print(f'Search completed in {elapsed:.1f}s')
             print(f'No trashed files match pattern "{pattern}"')
             print()
             continue
@@ -449,7 +636,6 @@ def run_glob_deletion(service, flags):
                 print(f'{viewed:<24}    {f["name"]}')
             print('-' * 60)
             print(f'Page {page_num}/{total_pages} ({len(page)} files)')
-            print(f'Search completed in {elapsed:.1f}s')
 
             if flags.view:
                 continue
@@ -460,9 +646,10 @@ def run_glob_deletion(service, flags):
                 confirmed = ask_usr_confirmation(len(page))
 
             if confirmed:
-                deleted_count = delete_files_batch(service, page, flags.timeout)
-                total_deleted += deleted_count
-                print(f'Deleted {deleted_count} file(s)')
+                deleted = delete_files_batch(service, page, flags.timeout, flags.concurrency)
+                deleted_ids.update(deleted)
+                total_deleted += len(deleted)
+                print(f'Deleted {len(deleted)} file(s)')
             else:
                 print('Skipped this page')
 
@@ -477,94 +664,286 @@ def load_globs_config(config_path):
         print(f'Error: Config file not found: {config_path}')
         sys.exit(1)
 
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config = json.load(f)
+    with open(config_path, 'rb') as f:
+        content = f.read()
+    config = orjson.loads(content) if orjson else json.loads(content)
 
     return config
 
 # Thread Safety Note (as of January 2026):
 # The google-api-python-client library uses httplib2 for HTTP transport, which is NOT
 # thread-safe. Sharing a single service object across threads can cause crashes, SSL errors,
-# and unpredictable behavior. Instead of using ThreadPoolExecutor, we use Google's batch
-# request API which bundles up to 100 requests in a single HTTP call.
+# and unpredictable behavior. Deletion uses Google's batch request API, which bundles up
+# to 100 requests in a single HTTP call, and runs several batch requests at once on a
+# ThreadPoolExecutor. Each worker thread executes its batches with its own Http object
+# (see thread_http), and batch results are only processed in the main thread. The pool
+# is kept for the whole run, so its threads keep their connections open between calls.
 # See: https://googleapis.github.io/google-api-python-client/docs/thread_safety.html
 
 BATCH_SIZE = 100  # Google API maximum batch size
+GLOB_Q_MAX_TERMS = 10  # Most name alternatives put in one query
+_deletePool = None
+_deletePoolSize = 0
 
-def delete_files_batch(service, files, timeout):
-    """Delete files using Google's batch request API.
+def delete_pool(concurrency):
+    """Return the thread pool running batch deletes, with concurrency workers
+    
+    The pool is reused across calls so that its threads, and the Http 
+    objects they hold, survive from one page of deletions to the next. A 
+    new pool is only made if concurrency changes."""
+    global _deletePool, _deletePoolSize
+    if _deletePool is None or _deletePoolSize != concurrency:
+        if _deletePool is not None:
+            _deletePool.shutdown(wait=False)
+        _deletePool = ThreadPoolExecutor(max_workers=concurrency)
+        _deletePoolSize = concurrency
+    return _deletePool
+
+def execute_delete_batch(service, file_ids):
+    """Delete up to BATCH_SIZE files with one batch request.
+
+    Safe to call from any thread; the request is executed with the calling
+    thread's own Http object.
 
     Args:
         service: Google API service object
-        files: List of file resources to delete
-        timeout: Request timeout in seconds
+        file_ids: IDs of the files to delete
 
     Returns:
-        Number of files successfully deleted
+        List of (file_id, exception) tuples, exception is None on success
     """
-    deleted_count = 0
-    errors = []
-    total_batches = (len(files) + BATCH_SIZE - 1) // BATCH_SIZE
-    start_time = time.time()
+    requests = [(file_id, service.files().delete(fileId=file_id)) for file_id in file_ids]
+    results = batch_execute(service, requests, thread_http(service))
+    return [(file_id, exception) for file_id, response, exception in results]
+
+
+def batch_execute(service, requests, http=None):
+    """Execute requests as batch requests of up to BATCH_SIZE each.
+
+    Args:
+        service: Google API service object
+        requests: List of (request_id, request) pairs, with unique request_ids
+        http: Optional Http object to execute the batches with, instead of
+              the service's own
+
+    Returns:
+        List of (request_id, response, exception) tuples, exception is None
+        on success
+    """
+    results = []
 
     def batch_callback(request_id, response, exception):
-        nonlocal deleted_count
-        if exception:
-            errors.append((request_id, exception))
-        else:
-            deleted_count += 1
+        results.append((request_id, response, exception))
 
-    # Process files in batches of BATCH_SIZE
-    batch_times = []
-    for batch_num, i in enumerate(range(0, len(files), BATCH_SIZE), 1):
-        batch_files = files[i:i + BATCH_SIZE]
+    for i in range(0, len(requests), BATCH_SIZE):
         batch = service.new_batch_http_request(callback=batch_callback)
+        for request_id, request in requests[i:i + BATCH_SIZE]:
+            batch.add(request, request_id=request_id)
+        batch.execute(http=http)
+    return results
 
-        for f in batch_files:
-            batch.add(
-                service.files().delete(fileId=f['id']),
-                request_id=f['id']
-            )
 
-        print(f'\rDeleting batch {batch_num}/{total_batches}...', end='', flush=True)
-        batch_start = time.time()
-        try:
-            batch.execute()
-        except Exception as e:
-            print(f' \033[93mretrying\033[0m...', end='', flush=True)
-            # Retry once
-            batch = service.new_batch_http_request(callback=batch_callback)
-            for f in batch_files:
-                batch.add(
-                    service.files().delete(fileId=f['id']),
-                    request_id=f['id']
-                )
+def delete_in_batches(service, file_ids, concurrency):
+    """Delete files in batches of BATCH_SIZE, with several batches in flight.
+
+    Args:
+        service: Google API service object
+        file_ids: IDs of the files to delete
+        concurrency: Maximum number of batch requests running at once
+
+    Yields:
+        (batch_ids, results, error) for each batch as it completes, where
+        results is the list returned by execute_delete_batch and error is the
+        exception raised by the whole batch request (results is then empty)
+    """
+    chunks = (file_ids[i:i + BATCH_SIZE] for i in range(0, len(file_ids), BATCH_SIZE))
+    executor = delete_pool(concurrency)
+    pending = {}
+
+    def submit_next():
+        chunk = next(chunks, None)
+        if chunk:
+            pending[executor.submit(execute_delete_batch, service, chunk)] = chunk
+
+    # Only concurrency batches are submitted at a time, so stopping early
+    # (e.g. Ctrl-C) leaves no queued deletions behind to run on their own
+    try:
+        for _ in range(concurrency):
+            submit_next()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = pending.pop(future)
+                submit_next()
+                try:
+                    results, error = future.result(), None
+                except Exception as e:
+                    results, error = [], e
+                yield chunk, results, error
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def delete_with_retry(service, file_ids, timeout, concurrency, on_batch=None):
+    """Delete files in concurrent batches and retry what failed.
+
+    A batch request that fails as a whole is retried once after a jittered
+    backoff (see backoff_delay) of at most timeout seconds; if the retry
+    fails too, every file in the batch is counted as failed with that
+    error. Failed deletions are then handed to retry_failed_deletes.
+
+    Args:
+        service: Google API service object
+        file_ids: IDs of the files to delete
+        timeout: Request timeout in seconds
+        concurrency: Maximum number of batch requests running at once
+        on_batch: Optional callable(batch_num, error) called in the main thread
+                  as each batch completes; error is the batch request error
+                  if its retry failed, None otherwise
+
+    Returns:
+        Tuple of (list of deleted file ids, list of (file_id, exception) errors)
+    """
+    deleted = []
+    errors = []
+    batches = delete_in_batches(service, file_ids, concurrency)
+    for batch_num, (batch_ids, results, error) in enumerate(batches, 1):
+        if error:
+            time.sleep(min(backoff_delay(0, error), timeout))
             try:
-                batch.execute()
-            except Exception as e2:
-                print(f' \033[91mFAILED\033[0m: {e2}')
+                results, error = execute_delete_batch(service, batch_ids), None
+            except Exception as e:
+                results, error = [(file_id, e) for file_id in batch_ids], e
+        for file_id, exception in results:
+            if exception:
+                errors.append((file_id, exception))
+            else:
+                deleted.append(file_id)
+        if on_batch:
+            on_batch(batch_num, error)
+
+    recovered, errors = retry_failed_deletes(service, errors, timeout)
+    deleted.extend(recovered)
+    return deleted, errors
+
+
+def delete_files_batch(service, files, timeout, concurrency=CONCURRENCY_DEFAULT):
+    """Delete files using Google's batch request API.
 
-        batch_elapsed = time.time() - batch_start
-        batch_times.append(batch_elapsed)
-        avg_batch_time = sum(batch_times) / len(batch_times)
+    Args:
+        service: Google API service object
+        files: List of file resources to delete
+        timeout: Request timeout in seconds
+        concurrency: Maximum number of batch requests running at once
+
+    Returns:
+        List of ids of the files successfully deleted
+    """
+    total_batches = (len(files) + BATCH_SIZE - 1) // BATCH_SIZE
+    start_time = time.time()
+
+    def report_batch(batch_num, error):
+        if error:
+            print(f' \033[91mFAILED\033[0m: {error}')
+        avg_batch_time = (time.time() - start_time) / batch_num
         remaining_batches = total_batches - batch_num
         eta = avg_batch_time * remaining_batches
-        print(f'\rDeleting batch {batch_num}/{total_batches}... {batch_elapsed:.1f}s (ETA: {eta:.0f}s)', end='', flush=True)
+        print(f'\rDeleting batch {batch_num}/{total_batches}... (ETA: {eta:.0f}s)' + ' ' * 10, end='', flush=True)
+
+    print(f'\rDeleting batch 0/{total_batches}...', end='', flush=True)
+    deleted, errors = delete_with_retry(service, [f['id'] for f in files], timeout,
+                                        concurrency, report_batch)
 
     elapsed = time.time() - start_time
     print(f'\rDeleting batch {total_batches}/{total_batches}... done ({elapsed:.1f}s total)' + ' ' * 20)
 
     # Report errors
     if errors:
+        name_by_id = {f['id']: f['name'] for f in files}
         print(f'\033[91m{len(errors)} error(s):\033[0m')
         for file_id, error in errors:
-            file_name = next((f['name'] for f in files if f['id'] == file_id), file_id)
-            print(f'  {file_name}: {error}')
+            print(f'  {name_by_id.get(file_id, file_id)}: {error}')
+
+    return deleted
+
+
+def retry_failed_deletes(service, errors, timeout):
+    """Retry failed batch deletions individually.
+
+    Subrequests of a batch that failed with a backend error (5xx) or were
+    rate limited (403 rate limit or 429) are re-sent one at a time through
+    execute_request, which itself retries 429 and 5xx responses with
+    backoff. A 403 rate limit error, which execute_request does not retry,
+    is retried here with exponential backoff (see backoff_delay) up to
+    DELETE_RETRY_NUM times. Other errors (e.g. 404) are returned unchanged.
+    All retries share one deadline of timeout seconds; errors left once it
+    has passed are returned as they are.
+
+    Args:
+        service: Google API service object
+        errors: List of (file_id, exception) tuples collected by a batch callback
+        timeout: Request timeout in seconds
+
+    Returns:
+        Tuple of (list of file ids deleted on retry, list of remaining errors)
+    """
+    recovered = []
+    remaining = []
+    # one deadline for all retries; once it has passed, the remaining
+    # errors are returned without being retried
+    deadline = time.monotonic() + timeout
+    timed_out = False
+    for file_id, error in errors:
+        for attempt in range(DELETE_RETRY_NUM):
+            if timed_out:
+                break
+            if isinstance(error, HttpError) and is_rate_limited(error):
+                delay = backoff_delay(attempt, error)
+                if time.monotonic() + delay > deadline:
+                    timed_out = True
+                    break
+                time.sleep(delay)
+            elif not isinstance(error, HttpError) or http_status(error) < 500:
+                break
+            time_left = deadline - time.monotonic()
+            if time_left <= 0:
+                timed_out = True
+                break
+            try:
+                execute_request(service.files().delete(fileId=file_id), time_left)
+            except HttpError as e:
+                error = e
+            except TimeoutError as e:
+                error = e
+                timed_out = True
+                break
+            else:
+                error = None
+                break
+        if error is None:
+            recovered.append(file_id)
+        else:
+            remaining.append((file_id, error))
+    return recovered, remaining
+
 
-    return deleted_count
+def is_rate_limited(error):
+    """Check if an HttpError means the request was throttled by Google."""
+    status = http_status(error)
+    if status in (429, 503):
+        return True
+    if status != 403:
+        return False
+    try:
+        reason = json.loads(error.content)['error']['errors'][0]['reason']
+    except (ValueError, KeyError, IndexError, TypeError):
+        return False
+    return reason in RATE_LIMIT_REASONS
 
 
-def has_parent_named(service, file_id, required_parent, timeout, cache=None):
+def has_parent_named(service, file_id, required_parent, timeout, cache=None,
+                     match_cache=None):
     """Check if a file has an ancestor folder with the given name.
 
     Args:
@@ -573,20 +952,32 @@ def has_parent_named(service, file_id, required_parent, timeout, cache=None):
         required_parent: Name of the required parent folder
         timeout: Request timeout in seconds
         cache: Optional dict to cache folder lookups (id -> name)
+        match_cache: Optional dict to cache results for required_parent
+                     (id -> bool); every folder on the walked chain is added
 
     Returns:
         True if any ancestor folder has the required name, False otherwise
     """
     if cache is None:
         cache = {}
+    if match_cache is None:
+        match_cache = {}
 
+    chain = []
+    result = False
     current_id = file_id
     while current_id:
+        if current_id in match_cache:
+            result = match_cache[current_id]
+            break
+        chain.append(current_id)
+
         # Check cache first
         if current_id in cache:
             name, parent_id = cache[current_id]
             if name == required_parent:
-                return True
+                result = True
+                break
             current_id = parent_id
             continue
 
@@ -599,84 +990,262 @@ def has_parent_named(service, file_id, required_parent, timeout, cache=None):
             cache[current_id] = (name, parent_id)
 
             if name == required_parent:
-                return True
+                result = True
+                break
             current_id = parent_id
         except HttpError:
-            # File may have been deleted or inaccessible
+            # File may have been deleted or inaccessible; don't remember the
+            # answer so a later call can try again
+            return False
+
+    # all folders on the chain share the outcome of their ancestors
+    for id in chain:
+        match_cache[id] = result
+    return result
+
+
+def prefetch_folders(service, timeout, cache):
+    """Fill a has_parent_named cache with every folder in one listing.
+
+    Walking the ancestry of each candidate file costs one files.get per
+    folder. Listing all folders up front, trashed or not, lets
+    has_parent_named walk the graph in memory; only folders missing from
+    the listing (such as the My Drive root) are still fetched one by one.
+
+    Args:
+        service: Google API service object
+        timeout: Request timeout in seconds
+        cache: Dict to fill with folder lookups (id -> (name, parent_id))
+    """
+    page_token = None
+    while True:
+        request = service.files().list(
+            q="mimeType='application/vnd.google-apps.folder'",
+            pageToken=page_token,
+            pageSize=1000,
+            fields='nextPageToken,files(id,name,parents)'
+        )
+        response = execute_request(request, timeout)
+        for f in response.get('files', []):
+            cache[f['id']] = (f.get('name', ''), f.get('parents', [None])[0])
+        page_token = response.get('nextPageToken')
+        if not page_token:
             break
 
-    return False
+
+def glob_to_drive_terms(pattern):
+    """Translate a glob pattern into Drive query terms on the file name.
+
+    A pattern without wildcards becomes an exact `name = '...'` match.
+    Otherwise the literal text before the first wildcard is pushed as
+    `name contains '...'`. Drive only does prefix matching on names with
+    `contains`, so a pattern starting with a wildcard gives no clause.
+    Simple character sets such as `[Bb]` are expanded into alternative
+    terms, to be joined with `or`, up to GLOB_Q_MAX_TERMS of them; ranges
+    and negated sets end the literal part like a wildcard does.
+    The terms are a pre-filter; names must still be checked with fnmatch.
+
+    Args:
+        pattern: Glob pattern to match filenames (e.g., "*.json", "exe_*.json")
+
+    Returns:
+        List of query term strings, or None if nothing can be filtered
+        server-side
+    """
+    prefixes = ['']
+    i = 0
+    exact = True
+    while i < len(pattern):
+        c = pattern[i]
+        if c in '*?':
+            exact = False
+            break
+        if c == '[':
+            # same rules as fnmatch: a ']' right after '[' belongs to the set,
+            # an unclosed '[' is a literal character
+            end = pattern.find(']', i + 2)
+            if end != -1:
+                chars = list(dict.fromkeys(pattern[i + 1:end]))
+                if (chars[0] == '!' or '-' in chars
+                        or len(prefixes) * len(chars) > GLOB_Q_MAX_TERMS):
+                    exact = False
+                    break
+                prefixes = [p + ch for p in prefixes for ch in chars]
+                i = end + 1
+                continue
+        prefixes = [p + c for p in prefixes]
+        i += 1
+    if exact:
+        terms = [f"name = '{escape_drive_q(p)}'" for p in prefixes]
+    elif prefixes[0]:
+        terms = [f"name contains '{escape_drive_q(p)}'" for p in prefixes]
+    else:
+        return None
+    return terms
+
+
+def escape_drive_q(value):
+    """Escape a string literal for use in a Drive query."""
+    return value.replace('\\', '\\\\').replace("'", "\\'")
 
 
-def get_trashed_files_by_glob(service, pattern, max_date, timeout, required_parent=None):
+def glob_matcher(pattern):
+    """Return a function checking whether a file name matches a glob pattern.
+
+    The pattern is compiled once; normcase keeps fnmatch.fnmatch semantics. It
+    only changes names on Windows, so elsewhere names are matched as is.
+    """
+    normcase = os.path.normcase
+    match = re.compile(fnmatch.translate(normcase(pattern))).match
+    if os.name == 'nt':
+        return lambda name: match(normcase(name))
+    return match
+
+
+def get_trashed_files_by_glob(service, pattern, max_date, timeout, required_parent=None,
+                              parent_cache=None, match_cache=None):
     """Get trashed files matching a glob pattern, filtered by date and parent.
 
+    See get_trashed_files_by_globs, which this calls with a single pattern.
+    """
+    return get_trashed_files_by_globs(service, [pattern], max_date, timeout,
+                                      required_parent, parent_cache, match_cache)
+
+
+def get_trashed_files_by_globs(service, patterns, max_date, timeout, required_parent=None,
+                               parent_cache=None, match_cache=None):
+    """Get trashed files matching any of several glob patterns, filtered by
+    date and parent.
+
+    Trashed files are listed once for all patterns, so callers handling
+    several patterns can split the result with glob_matcher instead of
+    listing the trash again for each.
+
     Args:
         service: Google API service object
-        pattern: Glob pattern to match filenames (e.g., "*.json", "exe_*.json")
+        patterns: Glob patterns to match filenames (e.g., "*.json", "exe_*.json")
         max_date: Only include files last opened before this date (YYYY-MM-DD)
         timeout: Request timeout in seconds
         required_parent: If set, only include files that have this folder name
                         somewhere in their path ancestry
+        parent_cache: Optional dict to cache folder lookups (id -> (name, parent_id)),
+                      can be shared between calls
+        match_cache: Optional dict to cache has_parent_named results for
+                     required_parent (id -> bool), can be shared between calls
+                     with the same required_parent
 
     Returns:
-        List of file resources matching the pattern
+        List of file resources matching any of the patterns
     """
     matching_files = []
-    page_token = None
-    parent_cache = {}  # Cache for parent folder lookups
-
-    # Parse max_date to timestamp for comparison
-    max_timestamp = None
+    never_opened = []  # files without viewedByMeTime, listed first
+    if parent_cache is None:
+        parent_cache = {}  # Cache for parent folder lookups
+    if match_cache is None:
+        match_cache = {}
+
+    # Normalise max_date to YYYY-MM-DD. RFC 3339 UTC times compare as strings,
+    # so viewedByMeTime can be checked against it without parsing.
+    max_day = None
     if max_date:
         try:
-            max_timestamp = calendar.timegm(time.strptime(max_date, '%Y-%m-%d'))
+            max_day = time.strftime('%Y-%m-%d', time.strptime(max_date, '%Y-%m-%d'))
         except ValueError:
             print(f'Warning: Invalid maxDateOpened format "{max_date}", ignoring date filter')
 
     # Include parents field if we need to check ancestry
-    fields = "nextPageToken,files(id,name,viewedByMeTime,trashedTime"
+    fields = "nextPageToken,files(id,name,viewedByMeTime"
     if required_parent:
         fields += ",parents"
     fields += ")"
 
-    while True:
-        # Query all trashed files owned by me
-        request = service.files().list(
-            q="trashed=true and 'me' in owners",
+    matchers = [glob_matcher(pattern) for pattern in patterns]
+    if len(matchers) == 1:
+        match_name = matchers[0]
+    else:
+        match_name = lambda name: any(match(name) for match in matchers)
+
+    # Let the server narrow the listing by name where every pattern allows it
+    query = "trashed=true and 'me' in owners"
+    pattern_terms = [glob_to_drive_terms(pattern) for pattern in patterns]
+    if all(pattern_terms):
+        name_terms = [term for terms in pattern_terms for term in terms]
+        if len(name_terms) == 1:
+            query += ' and ' + name_terms[0]
+        elif len(name_terms) <= GLOB_Q_MAX_TERMS:
+            query += ' and (' + ' or '.join(name_terms) + ')'
+
+    def list_files(page_token):
+        # Query trashed files owned by me, oldest opened first
+        return service.files().list(
+            q=query,
+            spaces='drive',
+            corpora='user',
+            orderBy='viewedByMeTime',
             pageToken=page_token,
             pageSize=1000,
             fields=fields
         )
-        response = execute_request(request, timeout)
-        files = response.get('files', [])
 
-        for f in files:
-            # Check if filename matches glob pattern
-            if not fnmatch.fnmatch(f['name'], pattern):
-                continue
-
-            # Check date filter
-            if max_timestamp and f.get('viewedByMeTime'):
-                viewed_time = parse_time(f['viewedByMeTime'])
-                if viewed_time >= max_timestamp:
+    # Pages are fetched one ahead on a worker thread with its own Http object,
+    # as in get_deletion_list
+    prefetcher = ThreadPoolExecutor(max_workers=1)
+    def fetch(request):
+        return execute_request(request, timeout, thread_http(service))
+    future = prefetcher.submit(fetch, list_files(None))
+    # Files without viewedByMeTime are listed together at one end: if the
+    # listing starts with one they all come first, otherwise they may come
+    # after the files opened on or after max_day.
+    nulls_first = None
+    past_max_day = False
+    try:
+        while future:
+            response = future.result()
+            files = response.get('files', [])
+            if nulls_first is None and files:
+                nulls_first = not files[0].get('viewedByMeTime')
+            # don't prefetch a page the date filter would stop before
+            page_token = response.get('nextPageToken')
+            last_viewed = files[-1].get('viewedByMeTime') if files else None
+            if nulls_first and max_day and last_viewed and last_viewed >= max_day:
+                page_token = None
+            future = prefetcher.submit(fetch, list_files(page_token)) if page_token else None
+
+            for f in files:
+                viewed = f.get('viewedByMeTime')
+
+                # Check date filter; all remaining opened files were opened later
+                if max_day and viewed and viewed >= max_day:
+                    if nulls_first:
+                        return never_opened + matching_files
+                    past_max_day = True
+                if past_max_day and viewed:
                     continue
 
-            # Check required parent filter
-            if required_parent:
-                parent_id = f.get('parents', [None])[0]
-                if parent_id and not has_parent_named(service, parent_id, required_parent, timeout, parent_cache):
+                # Check if filename matches a glob pattern
+                if not match_name(f['name']):
                     continue
 
-            matching_files.append(f)
+                # Check required parent filter
+                if required_parent:
+                    parent_id = f.get('parents', [None])[0]
+                    if parent_id and not has_parent_named(service, parent_id, required_parent,
+                                                          timeout, parent_cache, match_cache):
+                        continue
 
-        page_token = response.get('nextPageToken')
-        if not page_token:
-            break
+                if viewed:
+                    matching_files.append(f)
+                else:
+                    never_opened.append(f)
+    finally:
+        # drop the prefetched page if the listing stopped early
+        if future:
+            future.cancel()
+        prefetcher.shutdown(wait=False)
 
-    # Sort by viewedByMeTime (oldest first)
-    matching_files.sort(key=lambda x: x.get('viewedByMeTime') or '0000-00-00')
-    return matching_files
+    # Oldest opened first, never-opened files before all others. The server
+    # already returns opened files in this order, so no sort is needed.
+    return never_opened + matching_files
 
 class ScanProgress:
     def __init__(self, quiet, noProgress):
@@ -684,11 +1253,20 @@ class ScanProgress:
         self.noItemYet = True
         self.quiet = quiet
         self.noProgress = noProgress
+        # erase the progress line with ANSI EL on a terminal, elsewhere 
+        # overwrite it with spaces
+        if sys.stdout.isatty():
+            self.eraseLine = '\r\x1b[2K'
+        else:
+            self.eraseLine = '\r' + ''.ljust(40) + '\r'
     
     def print_time(self, timeStr):
         """print yyyy-mm-dd only if not yet printed"""
         if self.noProgress:
             return
+        # most changes fall on the day already printed, skip the slice for them
+        if timeStr.startswith(self.printed):
+            return
         ymd = timeStr[:10]
         if ymd > self.printed:
             print('\rScanning files trashed on ' + ymd, end='')
@@ -699,7 +1277,7 @@ class ScanProgress:
         if self.quiet:
             return
         if not self.noProgress:
-            print('\r' + ''.ljust(40) + '\r', end='')
+            print(self.eraseLine, end='')
         if self.noItemYet:
             print('Date trashed'.ljust(24) + ''.ljust(4) + 'File Name/Path')
             self.noItemYet = False
@@ -708,7 +1286,7 @@ class ScanProgress:
             print('\rScanning files trashed on ' + self.printed, end='')
     
     def clear_line(self):
-        print('\r' + ''.ljust(40) + '\r', end='')
+        print(self.eraseLine, end='')
         print()
 
 class PathFinder:
@@ -717,38 +1295,81 @@ class PathFinder:
     # each item in self.cache is a list with 2 elements
     # self.cache[id][0] is the full path of id
     # self.cache[id][1] is the number of times id has been queried
-        if cache:
-            self.cache = cache
-        else:
-            self.cache = dict()
+    # it holds at most PATH_CACHE_MAX ids, least recently used are evicted
+        self.cache = collections.OrderedDict(cache or ())
     # self.expanded contains all ids that have all their children cached
         self.expanded = set()
+    # self.fetched contains file resources prefetched but not yet cached as paths
+        self.fetched = dict()
     
     def get_path(self, id, fileRes=None):
         """Find the full path for id
         
         fileRes:    File resource for id. 
                     Must have 'name' and 'parents' attributes if available.
-                    If None or unspecified, an API call is made to query"""
+                    If None or unspecified, a prefetched resource is used or 
+                    an API call is made to query"""
         if id in self.cache:
-            if self.cache[id][1]>1 and id not in self.expanded:
-                # find and cache all children if id is requested more than once
-                self.expand_cache(id)
-            self.cache[id][1] += 1
-            return self.cache[id][0]
-        if not fileRes:
-            request = self.service.files().get(fileId=id, fields='name,parents')
-            fileRes = execute_request(request)
-        try:
-            parentId = fileRes['parents'][0]
-            self.cache[id] = [self.get_path(parentId) + os.sep + fileRes['name'], 1]
-        except KeyError:
-            self.cache[id] = [fileRes['name'], 1]
-        return self.cache[id][0]
+            return self.cached_path(id)
+        # walk up the parents until reaching a cached ancestor or the root
+        chain = []
+        path = None
+        while True:
+            if not fileRes:
+                fileRes = self.fetched.pop(id, None)
+            if not fileRes:
+                request = self.service.files().get(fileId=id, fields='name,parents')
+                fileRes = execute_request(request)
+            chain.append((id, fileRes['name']))
+            try:
+                id = fileRes['parents'][0]
+            except KeyError:
+                break
+            if id in self.cache:
+                path = self.cached_path(id)
+                break
+            fileRes = None
+        for id, name in reversed(chain):
+            path = name if path is None else path + os.sep + name
+            self.cache_path(id, path, 1)
+        return path
+    
+    def cached_path(self, id):
+        """Return the cached full path for id and count the query"""
+        entry = self.cache[id]
+        self.cache.move_to_end(id)
+        if entry[1]>1 and id not in self.expanded:
+            # find and cache all children if id is requested more than once
+            self.expand_cache(id)
+        entry[1] += 1
+        return entry[0]
+    
+    def prefetch(self, ids):
+        """Fetch file resources for ids and all their uncached ancestors
+        
+        Resources are fetched one level of ancestry at a time with up to 
+        BATCH_SIZE lookups per batch request, so later calls to get_path need 
+        no API calls. Failed lookups, or a failed batch request, are left for 
+        get_path to retry, since prefetching is only an optimisation."""
+        files = self.service.files()
+        pending = [id for id in set(ids) if id not in self.cache and id not in self.fetched]
+        while pending:
+            try:
+                results = batch_execute(self.service, 
+                        [(id, files.get(fileId=id, fields='name,parents')) for id in pending])
+            except (HttpError, httplib2.HttpLib2Error, OSError):
+                return
+            parentIds = set()
+            for id, fileRes, exception in results:
+                if exception is None:
+                    self.fetched[id] = fileRes
+                    parentIds.update(fileRes.get('parents', [])[:1])
+            pending = [id for id in parentIds if id not in self.cache and id not in self.fetched]
     
     def expand_cache(self, id):
         if id in self.expanded:
             return
+        prefix = self.cache[id][0] + os.sep
         npt = None
         while True:
             request = self.service.files().list(
@@ -760,48 +1381,114 @@ class PathFinder:
             for file in response['files']:
                 if file['id'] in self.cache:
                     continue
-                self.cache[file['id']] = [self.cache[id][0] + os.sep + file['name'], 0]
+                self.cache_path(file['id'], prefix + file['name'], 0)
             try:
                 npt = response['nextPageToken']
             except KeyError:
                 break
         self.expanded.add(id)
     
+    def cache_path(self, id, path, count):
+        """Cache the full path of id, evicting the least recently used id if 
+        the cache is full"""
+        self.cache[id] = [path, count]
+        if len(self.cache) > PATH_CACHE_MAX:
+            evicted, _ = self.cache.popitem(last=False)
+            self.expanded.discard(evicted)
+    
     def clear():
         self.cache.clear()
 
-def execute_request(request, timeout=TIMEOUT_DEFAULT):
+def execute_request(request, timeout=TIMEOUT_DEFAULT, http=None):
     """Execute Google API request
-    Automatic retry upon Google backend error (500) until timeout
+    Automatic retry upon rate limit (429) and Google backend errors (5xx) 
+    with exponential backoff (see backoff_delay) until timeout. Other errors 
+    such as 401 and 403 are raised at once
+    If http is given, it is used instead of the service's Http object
     """
-    while timeout >= 0:
+    deadline = time.monotonic() + timeout
+    attempt = 0
+    while True:
         try:
-            response = request.execute()
+            return request.execute(http=http)
         except HttpError as e:
-            if int(e.args[0]['status']) == 500:
-                timeout -= RETRY_INTERVAL
-                time.sleep(RETRY_INTERVAL)
-                continue
-            raise e
-        else:
-            return response
-    raise TimeoutError
+            if http_status(e) not in RETRYABLE_STATUSES:
+                raise e
+            delay = backoff_delay(attempt, e)
+            if time.monotonic() + delay > deadline:
+                raise TimeoutError
+            time.sleep(delay)
+            attempt += 1
+
+def http_status(error):
+    """HTTP status code of an HttpError, as an int"""
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        # older google-api-python-client only has the response status
+        status = int(error.resp.status)
+    return status
+
+def backoff_delay(attempt, error=None):
+    """Seconds to wait before retry number attempt (counting from 0)
+    
+    Exponential backoff with full jitter: a random delay of up to 
+    RETRY_INTERVAL * 2**attempt, capped at RETRY_DELAY_MAX, so that 
+    retries of different requests don't line up. If error is an HttpError 
+    whose response asks to retry after a number of seconds (Retry-After), 
+    the delay is at least that long, but never more than RETRY_DELAY_MAX."""
+    delay = random.uniform(0, min(RETRY_DELAY_MAX, RETRY_INTERVAL * 2**attempt))
+    resp = getattr(error, 'resp', None)
+    if resp is not None:
+        try:
+            delay = max(delay, min(int(resp.get('retry-after')), RETRY_DELAY_MAX))
+        except (TypeError, ValueError):
+            pass  # no header, or given as an HTTP date
+    return delay
 
 def ask_usr_confirmation(n):
+    if n == 1:
+        prompt = 'Confirm deleting this file/folder? (Y/N)\n'
+    else:
+        prompt = 'Confirm deleting these {:} files/folders? (Y/N)\n'.format(n)
     while True:
-        if n == 1:
-            usrInput = input('Confirm deleting this file/folder? (Y/N)\n')
-        else:
-            usrInput = input('Confirm deleting these {:} files/folders? (Y/N)\n'.format(n))
-        if usrInput.strip().lower() == 'y':
-            return True
-        elif usrInput.strip().lower() == 'n':
-            return False
+        usrInput = input(prompt).strip().lower()
+        if usrInput in ('y', 'n'):
+            return usrInput == 'y'
 
 def parse_time(rfc3339):
-    """parse the RfC 3339 time given by Google into Unix time"""
-    time_str = rfc3339.split('.')[0]
-    return calendar.timegm(time.strptime(time_str, '%Y-%m-%dT%H:%M:%S'))
+    """parse the RfC 3339 time given by Google into Unix time
+    
+    Google always returns 'YYYY-MM-DDTHH:MM:SS.sssZ', so the fields are 
+    sliced at fixed offsets instead of going through time.strptime."""
+    s = rfc3339
+    return (days_since_epoch(s[:10])*86400 + int(s[11:13])*3600
+            + int(s[14:16])*60 + int(s[17:19]))
+
+def parse_times(rfc3339s):
+    """parse_time for a list of times, returns a list of Unix times
+    
+    The parsing is inlined in one list comprehension, which saves a function 
+    call per time on long lists such as pages of the change list. (A 
+    compiled regex extracting the fields is slower than slicing.)"""
+    days = days_since_epoch
+    return [days(s[:10])*86400 + int(s[11:13])*3600 + int(s[14:16])*60 + int(s[17:19])
+            for s in rfc3339s]
+
+# days in the year before the first of each month, in a non-leap year
+DAYS_BEFORE_MONTH = (0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+
+@functools.lru_cache(maxsize=4096)
+def days_since_epoch(ymd):
+    """number of days from 1970-01-01 to the date 'YYYY-MM-DD'
+    
+    Computed with integer arithmetic rather than calendar.timegm. Cached 
+    since consecutive changes mostly share the same date."""
+    y, m, d = int(ymd[0:4]), int(ymd[5:7]), int(ymd[8:10])
+    # leap days in the years from 1970 to y-1
+    leapDays = (y-1969)//4 - (y-1901)//100 + (y-1601)//400
+    if m > 2 and y%4 == 0 and (y%100 != 0 or y%400 == 0):
+        leapDays += 1
+    return (y-1970)*365 + leapDays + DAYS_BEFORE_MONTH[m-1] + d - 1
 
 if __name__ == '__main__':
     try:
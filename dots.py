@@ -1,5 +1,15 @@
 """Simple utility for printing progress dots."""
+import sys
 import time
+from collections import deque
+
+ETA_EVERY = 8        # recompute the ETA at least every this many dots
+ETA_INTERVAL = 0.2   # or when this many seconds have passed
+AVERAGE_WINDOW = 64  # number of recent dots the average time is taken over
+ETA_MIN_TOTAL = 20   # no ETA for fewer dots than this in total
+ETA_MIN_DOTS = 5     # nor before this many dots, while the average is noisy
+FLUSH_EVERY = 16     # write buffered output at least every this many dots
+FLUSH_INTERVAL = 0.1 # or when this many seconds have passed
 
 
 class Dots:
@@ -9,52 +19,119 @@ class Dots:
         self.total = total
         self.width = width
         self.column = 0
-        self.timestamps = []
+        # timestamps of the most recent dots; count and first_time cover all
+        self.timestamps = deque(maxlen=AVERAGE_WINDOW)
+        self.count = 0
+        self.first_time = None
+        self.eta_str = ''
+        # length of the ETA after the row once the buffered output is
+        # written, and as last written
+        self.last_eta_len = 0
+        self._shown_eta_len = 0
+        self._last_eta_t = 0
+        self._out = sys.stdout
+        # output of recent dots, written out together by _flush: the rows
+        # completed since, and what is pending for the current row. A redraw
+        # of the row replaces the pending text, so only what ends up on
+        # screen is written.
+        self._buf = []
+        self._tail = ''
+        self._buf_dots = 0
+        self._buf_t = time.monotonic()
+        # the row being printed, without the ETA; each update rewrites it
+        # from the start of the line
+        self.line = msg or ''
         if msg:
             print(msg, end='', flush=True)
             self.column = len(msg)
 
     def dot(self, char='.'):
-        """Print a single character without a newline."""
-        self._clear_eta()
-        self.timestamps.append(time.time())
-        print(char, end='', flush=True)
+        """Print a single character without a newline.
+
+        Output is buffered: it is written once FLUSH_EVERY dots have been
+        buffered or FLUSH_INTERVAL seconds have passed, and by done().
+        """
+        now = time.monotonic()
+        self.timestamps.append(now)
+        self.count += 1
+        if self.first_time is None:
+            self.first_time = now
+        self.line += char
         self.column += 1
+        if (not self.eta_str or self.count % ETA_EVERY == 0
+                or now - self._last_eta_t >= ETA_INTERVAL):
+            self.eta_str = self._format_eta()
+            self._last_eta_t = now
         if self.column >= self.width:
-            print()
+            # the full row is left without an ETA
+            if self.last_eta_len:
+                self._tail = '\r' + self.line + self._eta_padding(0) + '\n'
+            else:
+                self._tail += char + '\n'
+            self._buf.append(self._tail)
+            self.line = ''
             self.column = 0
-        self._print_eta()
+            self._shown_eta_len = 0
+            self._tail = self.eta_str
+            self.last_eta_len = len(self.eta_str)
+        elif self.eta_str or self.last_eta_len:
+            # the ETA moves with the row, so the row is redrawn
+            padding = self._eta_padding(len(self.eta_str))
+            self._tail = '\r' + self.line + self.eta_str + padding
+            if padding and not self.eta_str:
+                # back to the end of the row, where the next dot goes
+                self._tail += '\r' + self.line
+        else:
+            self._tail += char
+        self._buf_dots += 1
+        if self._buf_dots >= FLUSH_EVERY or now - self._buf_t >= FLUSH_INTERVAL:
+            self._flush(now)
+
+    def _flush(self, now=None):
+        """Write out the buffered output of recent dots in one write."""
+        if self._buf or self._tail:
+            self._out.write(''.join(self._buf) + self._tail)
+            self._out.flush()
+            self._buf.clear()
+            self._tail = ''
+        self._shown_eta_len = self.last_eta_len
+        self._buf_dots = 0
+        self._buf_t = time.monotonic() if now is None else now
 
-    def _print_eta(self):
-        """Print estimated time remaining if total is known."""
-        if self.total is None or len(self.timestamps) < 2:
-            self.last_eta_len = 0
-            return
+    def _format_eta(self):
+        """Return the estimated time remaining if total is known."""
+        if (self.total is None or self.total < ETA_MIN_TOTAL
+                or self.count < ETA_MIN_DOTS):
+            return ''
         avg = self.average_time()
-        remaining = self.total - len(self.timestamps)
+        remaining = self.total - self.count
         eta_seconds = avg * remaining
-        eta_str = f" {avg:.2f}s/dot, {eta_seconds:.0f}s remaining"
-        self.last_eta_len = len(eta_str)
-        print(eta_str, end='', flush=True)
+        return f" {avg:.2f}s/dot, {eta_seconds:.0f}s remaining"
+
+    def _eta_padding(self, new_len):
+        """Return the spaces needed to blank out the rest of the ETA on
+        screen once new_len characters have been written over it."""
+        self.last_eta_len = new_len
+        return ' ' * max(0, self._shown_eta_len - new_len)
 
     def _clear_eta(self):
         """Clear the previously printed ETA."""
-        if hasattr(self, 'last_eta_len') and self.last_eta_len > 0:
-            # Use ANSI escape to clear to end of line, then backspace over the ETA
-            print(f'\x1b[{self.last_eta_len}D\x1b[K', end='', flush=True)
-            self.last_eta_len = 0
+        padding = self._eta_padding(0)
+        if padding:
+            print('\r' + self.line + padding + '\r' + self.line, end='', flush=True)
 
     def done(self, message='done'):
         """Print a completion message with a newline and total execution time."""
+        self._flush()
         self._clear_eta()
-        if len(self.timestamps) >= 2:
-            total_time = self.timestamps[-1] - self.timestamps[0]
+        if self.count >= 2:
+            total_time = self.timestamps[-1] - self.first_time
             print(f'{message} (total time: {total_time:.1f}s)')
         else:
             print(message)
 
     def average_time(self):
-        """Return the average time between dots in seconds."""
+        """Return the average time between recent dots in seconds."""
         if len(self.timestamps) < 2:
             return 0
         total_time = self.timestamps[-1] - self.timestamps[0]
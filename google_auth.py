@@ -16,11 +16,14 @@
 
 import os
 import sys
+import tempfile
+from functools import cached_property
 
 from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from google.auth.exceptions import RefreshError
+
+# InstalledAppFlow, Request and RefreshError are imported where they are
+# used: they pull in requests and oauthlib, which a run with valid stored
+# credentials never needs.
 
 
 class GoogleAuth:
@@ -47,7 +50,7 @@ class GoogleAuth:
         app_name: str = 'Google API Application'
     ):
         self.scopes = scopes
-        self.client_secrets_file = os.path.realpath(client_secrets_file)
+        self._client_secrets_path = client_secrets_file
         self.app_name = app_name
 
         # Default credentials location: ~/.credentials/<app-name>.json
@@ -56,7 +59,24 @@ class GoogleAuth:
             credentials_file = os.path.join(
                 os.path.expanduser('~'), '.credentials', f'{safe_name}.json'
             )
-        self.credentials_file = os.path.realpath(os.path.expanduser(credentials_file))
+        self._credentials_path = os.path.expanduser(credentials_file)
+        self._dir_ensured = False
+        self._request = None  # transport reused by credential refreshes
+        self._cached = None   # credentials returned by get_credentials
+
+    @cached_property
+    def client_secrets_file(self) -> str:
+        """Absolute path of the client secrets file, resolved on first use.
+
+        Only the OAuth flow reads it, so runs with valid stored credentials
+        never resolve it.
+        """
+        return os.path.realpath(self._client_secrets_path)
+
+    @cached_property
+    def credentials_file(self) -> str:
+        """Absolute path of the credentials file, resolved on first use."""
+        return os.path.realpath(self._credentials_path)
 
     def get_credentials(
         self,
@@ -66,6 +86,7 @@ class GoogleAuth:
     ) -> Credentials:
         """Get valid user credentials, authenticating if necessary.
 
+        Credentials returned by an earlier call are reused while valid.
         If stored credentials exist and are valid, returns them.
         If credentials are expired, attempts to refresh them.
         If no valid credentials exist, runs the OAuth flow.
@@ -83,37 +104,50 @@ class GoogleAuth:
             FileNotFoundError: If client_secrets_file doesn't exist
             RefreshError: If credential refresh fails and re-auth is needed
         """
+        # Credentials from an earlier call are reused while still valid
+        if self._cached and self._cached.valid:
+            return self._cached
+
         credentials = self._load_credentials()
 
         if credentials and credentials.valid:
+            self._cached = credentials
             return credentials
 
         if credentials and credentials.expired and credentials.refresh_token:
             credentials = self._refresh_credentials(credentials)
             if credentials:
                 self._save_credentials(credentials)
+                self._cached = credentials
                 return credentials
 
         # Need to run full OAuth flow
         credentials = self._run_oauth_flow(use_local_server, host, port)
         self._save_credentials(credentials)
+        self._cached = credentials
         return credentials
 
     def _load_credentials(self) -> Credentials | None:
         """Load credentials from file if it exists."""
-        if os.path.exists(self.credentials_file):
-            try:
-                return Credentials.from_authorized_user_file(
-                    self.credentials_file, self.scopes
-                )
-            except Exception:
-                return None
-        return None
+        try:
+            return Credentials.from_authorized_user_file(
+                self.credentials_file, self.scopes
+            )
+        except Exception:
+            # Missing or unreadable credentials file
+            return None
 
     def _refresh_credentials(self, credentials: Credentials) -> Credentials | None:
         """Attempt to refresh expired credentials."""
+        from google.auth.transport.requests import Request
+        from google.auth.exceptions import RefreshError
+
+        # One Request keeps its session, and so its connection to the token
+        # endpoint, across refreshes
+        if self._request is None:
+            self._request = Request()
         try:
-            credentials.refresh(Request())
+            credentials.refresh(self._request)
             return credentials
         except RefreshError:
             return None
@@ -135,6 +169,8 @@ class GoogleAuth:
                 f"4. Download the JSON file and save it as '{self.client_secrets_file}'"
             )
 
+        from google_auth_oauthlib.flow import InstalledAppFlow
+
         flow = InstalledAppFlow.from_client_secrets_file(
             self.client_secrets_file, self.scopes
         )
@@ -147,10 +183,23 @@ class GoogleAuth:
         return credentials
 
     def _save_credentials(self, credentials: Credentials) -> None:
-        """Save credentials to file for future use."""
-        os.makedirs(os.path.dirname(self.credentials_file), exist_ok=True)
-        with open(self.credentials_file, 'w') as f:
-            f.write(credentials.to_json())
+        """Save credentials to file for future use.
+
+        The file is written under a temporary name and then moved into place,
+        so an interrupted save never leaves a truncated credentials file.
+        """
+        directory = os.path.dirname(self.credentials_file)
+        if not self._dir_ensured:
+            os.makedirs(directory, exist_ok=True)
+            self._dir_ensured = True
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(credentials.to_json())
+            os.replace(tmp_path, self.credentials_file)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
 
     def clear_credentials(self) -> bool:
         """Delete stored credentials file.
@@ -158,7 +207,9 @@ class GoogleAuth:
         Returns:
             True if file was deleted, False if it didn't exist
         """
-        if os.path.exists(self.credentials_file):
+        self._cached = None
+        try:
             os.remove(self.credentials_file)
-            return True
-        return False
+        except FileNotFoundError:
+            return False
+        return True